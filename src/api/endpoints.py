@@ -1,5 +1,7 @@
-from fastapi import APIRouter, Query
-from fastapi.responses import JSONResponse
+from typing import Any, Dict, Type
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
 from src.api.models import (
     ProducaoResponse, 
     ComercializacaoResponse, 
@@ -7,119 +9,145 @@ from src.api.models import (
     ProcessamentoSemClassificacaoResponse,
     ImportacaoExportacaoResponse
 )
-from src.data.embrapa_scraper import (
-    fetch_and_parse_producao,
-    fetch_and_parse_comercializacao,
-    fetch_and_parse_processamento,
-    fetch_and_parse_comex
-)
+from src.data import sources
+from src.api.query import ListQuery, apply_list_query
+from src.timing import record_stage
 
 router = APIRouter()
 
 
+def _render(response_model: Type[BaseModel], data: Dict[str, Any], query: ListQuery) -> Response:
+    """
+    Aplica filtros, ordenação e paginação, valida os dados com o modelo de resposta e
+    serializa o JSON com a projeção de campos pedida, medindo cada etapa separadamente
+    para o header Server-Timing. Retornar a Response pronta evita que o FastAPI repita
+    a validação e a serialização.
+    """
+    data, include, headers = apply_list_query(data, query, response_model)
+    with record_stage("validate"):
+        model = response_model.model_validate(data)
+    with record_stage("render"):
+        content = model.model_dump_json(include=include)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
 @router.get("/producao", response_model=ProducaoResponse, response_class=JSONResponse, summary="Produção anual de vinhos/derivados RS")
 async def producao(
-    ano: int = Query(..., ge=1970, le=2023, description="Ano da produção (entre 1970 e 2023)")
+    ano: int = Query(..., ge=1970, le=2023, description="Ano da produção (entre 1970 e 2023)"),
+    query: ListQuery = Depends()
 ):
-    return await fetch_and_parse_producao(ano)
+    return _render(ProducaoResponse, await sources.PRODUCAO.fetch(ano), query)
 
 
 @router.get("/comercializacao", response_model=ComercializacaoResponse, response_class=JSONResponse, summary="Comercialização anual de vinhos e derivados RS")
 async def comercializacao(
-    ano: int = Query(..., ge=1970, le=2023, description="Ano da comercialização (entre 1970 e 2023)")
+    ano: int = Query(..., ge=1970, le=2023, description="Ano da comercialização (entre 1970 e 2023)"),
+    query: ListQuery = Depends()
 ):
-    return await fetch_and_parse_comercializacao(ano)
+    return _render(ComercializacaoResponse, await sources.COMERCIALIZACAO.fetch(ano), query)
 
 
 @router.get("/processamento/viniferas", response_model=ProcessamentoResponse, response_class=JSONResponse, summary="Processamento anual de uvas viníferas RS")
 async def processamento_viniferas(
-    ano: int = Query(..., ge=1970, le=2023, description="Ano do processamento (entre 1970 e 2023)")
+    ano: int = Query(..., ge=1970, le=2023, description="Ano do processamento (entre 1970 e 2023)"),
+    query: ListQuery = Depends()
 ):
-    return await fetch_and_parse_processamento("subopt_01", ano, "viníferas")
+    return _render(ProcessamentoResponse, await sources.PROCESSAMENTO_VINIFERAS.fetch(ano), query)
 
 
 @router.get("/processamento/americanas-hibridas", response_model=ProcessamentoResponse, response_class=JSONResponse, summary="Processamento anual de uvas americanas e híbridas RS")
 async def processamento_americanas_hibridas(
-    ano: int = Query(..., ge=1970, le=2023, description="Ano do processamento (entre 1970 e 2023)")
+    ano: int = Query(..., ge=1970, le=2023, description="Ano do processamento (entre 1970 e 2023)"),
+    query: ListQuery = Depends()
 ):
-    return await fetch_and_parse_processamento("subopt_02", ano, "americanas-híbridas")
+    return _render(ProcessamentoResponse, await sources.PROCESSAMENTO_AMERICANAS_HIBRIDAS.fetch(ano), query)
 
 
 @router.get("/processamento/uvas-mesa", response_model=ProcessamentoResponse, response_class=JSONResponse, summary="Processamento anual de uvas de mesa RS")
 async def processamento_uvas_mesa(
-    ano: int = Query(..., ge=1970, le=2023, description="Ano do processamento (entre 1970 e 2023)")
+    ano: int = Query(..., ge=1970, le=2023, description="Ano do processamento (entre 1970 e 2023)"),
+    query: ListQuery = Depends()
 ):
-    return await fetch_and_parse_processamento("subopt_03", ano, "uvas-mesa")
+    return _render(ProcessamentoResponse, await sources.PROCESSAMENTO_UVAS_MESA.fetch(ano), query)
 
 
 @router.get("/processamento/sem-classificacao", response_model=ProcessamentoSemClassificacaoResponse, response_class=JSONResponse, summary="Processamento anual de uvas sem classificação RS")
 async def processamento_sem_classificacao(
-    ano: int = Query(..., ge=1970, le=2023, description="Ano do processamento (entre 1970 e 2023)")
+    ano: int = Query(..., ge=1970, le=2023, description="Ano do processamento (entre 1970 e 2023)"),
+    query: ListQuery = Depends()
 ):
-    return await fetch_and_parse_processamento("subopt_04", ano, "sem-classificação")
+    return _render(ProcessamentoSemClassificacaoResponse, await sources.PROCESSAMENTO_SEM_CLASSIFICACAO.fetch(ano), query)
 
 
 # --- Endpoints de Importação ---
 @router.get("/importacao/vinho-mesa", response_model=ImportacaoExportacaoResponse, response_class=JSONResponse, summary="Importação anual de vinhos de mesa")
 async def importacao_vinho_mesa(
-    ano: int = Query(..., ge=1970, le=2024, description="Ano da importação (entre 1970 e 2024)")
+    ano: int = Query(..., ge=1970, le=2024, description="Ano da importação (entre 1970 e 2024)"),
+    query: ListQuery = Depends()
 ):
-    return await fetch_and_parse_comex("opt_05", "subopt_01", ano, "importação")
+    return _render(ImportacaoExportacaoResponse, await sources.IMPORTACAO_VINHO_MESA.fetch(ano), query)
 
 
 @router.get("/importacao/espumante", response_model=ImportacaoExportacaoResponse, response_class=JSONResponse, summary="Importação anual de espumantes")
 async def importacao_espumante(
-    ano: int = Query(..., ge=1970, le=2024, description="Ano da importação (entre 1970 e 2024)")
+    ano: int = Query(..., ge=1970, le=2024, description="Ano da importação (entre 1970 e 2024)"),
+    query: ListQuery = Depends()
 ):
-    return await fetch_and_parse_comex("opt_05", "subopt_02", ano, "importação")
+    return _render(ImportacaoExportacaoResponse, await sources.IMPORTACAO_ESPUMANTE.fetch(ano), query)
 
 
 @router.get("/importacao/uvas-frescas", response_model=ImportacaoExportacaoResponse, response_class=JSONResponse, summary="Importação anual de uvas frescas")
 async def importacao_uvas_frescas(
-    ano: int = Query(..., ge=1970, le=2024, description="Ano da importação (entre 1970 e 2024)")
+    ano: int = Query(..., ge=1970, le=2024, description="Ano da importação (entre 1970 e 2024)"),
+    query: ListQuery = Depends()
 ):
-    return await fetch_and_parse_comex("opt_05", "subopt_03", ano, "importação")
+    return _render(ImportacaoExportacaoResponse, await sources.IMPORTACAO_UVAS_FRESCAS.fetch(ano), query)
 
 
 @router.get("/importacao/uvas-passas", response_model=ImportacaoExportacaoResponse, response_class=JSONResponse, summary="Importação anual de uvas passas")
 async def importacao_uvas_passas(
-    ano: int = Query(..., ge=1970, le=2024, description="Ano da importação (entre 1970 e 2024)")
+    ano: int = Query(..., ge=1970, le=2024, description="Ano da importação (entre 1970 e 2024)"),
+    query: ListQuery = Depends()
 ):
-    return await fetch_and_parse_comex("opt_05", "subopt_04", ano, "importação")
+    return _render(ImportacaoExportacaoResponse, await sources.IMPORTACAO_UVAS_PASSAS.fetch(ano), query)
 
 
 @router.get("/importacao/suco-uva", response_model=ImportacaoExportacaoResponse, response_class=JSONResponse, summary="Importação anual de suco de uva")
 async def importacao_suco_uva(
-    ano: int = Query(..., ge=1970, le=2024, description="Ano da importação (entre 1970 e 2024)")
+    ano: int = Query(..., ge=1970, le=2024, description="Ano da importação (entre 1970 e 2024)"),
+    query: ListQuery = Depends()
 ):
-    return await fetch_and_parse_comex("opt_05", "subopt_05", ano, "importação")
+    return _render(ImportacaoExportacaoResponse, await sources.IMPORTACAO_SUCO_UVA.fetch(ano), query)
 
 
 # --- Endpoints de Exportação ---
 @router.get("/exportacao/vinho-mesa", response_model=ImportacaoExportacaoResponse, response_class=JSONResponse, summary="Exportação anual de vinhos de mesa")
 async def exportacao_vinho_mesa(
-    ano: int = Query(..., ge=1970, le=2024, description="Ano da exportação (entre 1970 e 2024)")
+    ano: int = Query(..., ge=1970, le=2024, description="Ano da exportação (entre 1970 e 2024)"),
+    query: ListQuery = Depends()
 ):
-    return await fetch_and_parse_comex("opt_06", "subopt_01", ano, "exportação")
+    return _render(ImportacaoExportacaoResponse, await sources.EXPORTACAO_VINHO_MESA.fetch(ano), query)
 
 
 @router.get("/exportacao/espumante", response_model=ImportacaoExportacaoResponse, response_class=JSONResponse, summary="Exportação anual de espumantes")
 async def exportacao_espumante(
-    ano: int = Query(..., ge=1970, le=2024, description="Ano da exportação (entre 1970 e 2024)")
+    ano: int = Query(..., ge=1970, le=2024, description="Ano da exportação (entre 1970 e 2024)"),
+    query: ListQuery = Depends()
 ):
-    return await fetch_and_parse_comex("opt_06", "subopt_02", ano, "exportação")
+    return _render(ImportacaoExportacaoResponse, await sources.EXPORTACAO_ESPUMANTE.fetch(ano), query)
 
 
 @router.get("/exportacao/uvas-frescas", response_model=ImportacaoExportacaoResponse, response_class=JSONResponse, summary="Exportação anual de uvas frescas")
 async def exportacao_uvas_frescas(
-    ano: int = Query(..., ge=1970, le=2024, description="Ano da exportação (entre 1970 e 2024)")
+    ano: int = Query(..., ge=1970, le=2024, description="Ano da exportação (entre 1970 e 2024)"),
+    query: ListQuery = Depends()
 ):
-    return await fetch_and_parse_comex("opt_06", "subopt_03", ano, "exportação")
+    return _render(ImportacaoExportacaoResponse, await sources.EXPORTACAO_UVAS_FRESCAS.fetch(ano), query)
 
 
 @router.get("/exportacao/suco-uva", response_model=ImportacaoExportacaoResponse, response_class=JSONResponse, summary="Exportação anual de suco de uva")
 async def exportacao_suco_uva(
-    ano: int = Query(..., ge=1970, le=2024, description="Ano da exportação (entre 1970 e 2024)")
+    ano: int = Query(..., ge=1970, le=2024, description="Ano da exportação (entre 1970 e 2024)"),
+    query: ListQuery = Depends()
 ):
-    # Exportação usa subopt_04 para suco de uva
-    return await fetch_and_parse_comex("opt_06", "subopt_04", ano, "exportação")
+    return _render(ImportacaoExportacaoResponse, await sources.EXPORTACAO_SUCO_UVA.fetch(ano), query)
@@ -0,0 +1,141 @@
+import base64
+import binascii
+import json
+from typing import Any, Dict, List, Optional, Set, Tuple, Type
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+
+# Campos que identificam cada item, por ordem de preferência, e os das listas aninhadas
+NAME_FIELDS = ["pais", "produto", "categoria", "item"]
+CHILD_LISTS = {"subitems": "produto", "cultivares": "cultivar"}
+
+
+class ListQuery:
+    """Parâmetros de projeção, filtro, ordenação e paginação comuns a todas as rotas."""
+
+    def __init__(
+        self,
+        fields: Optional[str] = Query(None, description="Campos dos itens a retornar, separados por vírgula (ex: pais,valor_usd)"),
+        pais: Optional[str] = Query(None, description="Filtra países que contenham o texto (importação/exportação)"),
+        produto: Optional[str] = Query(None, description="Filtra produtos, categorias ou cultivares que contenham o texto"),
+        ordenar: Optional[str] = Query(None, description="Ordena por quantidade ou valor; prefixe com '-' para ordem decrescente (ex: -valor)"),
+        limit: Optional[int] = Query(None, ge=1, le=1000, description="Quantidade máxima de itens por página"),
+        cursor: Optional[str] = Query(None, description="Cursor da próxima página, retornado no header X-Next-Cursor")
+    ):
+        self.fields = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+        self.pais = pais
+        self.produto = produto
+        self.ordenar = ordenar
+        self.limit = limit
+        self.cursor = cursor
+
+
+def _query_signature(query: ListQuery) -> List[Optional[str]]:
+    """Parâmetros que definem a ordem dos itens; um cursor só vale para a mesma combinação."""
+    return [query.pais, query.produto, query.ordenar]
+
+
+def _encode_cursor(offset: int, query: ListQuery) -> str:
+    payload = json.dumps({"offset": offset, "query": _query_signature(query)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, query: ListQuery) -> int:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+        offset = payload["offset"]
+        if not isinstance(offset, int) or offset < 0:
+            raise ValueError(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail=f"Cursor inválido: {cursor}")
+    if payload.get("query") != _query_signature(query):
+        raise HTTPException(status_code=400, detail="Cursor gerado com outros filtros ou ordenação; refaça a consulta sem o cursor")
+    return offset
+
+
+def _to_number(value: Optional[str]) -> float:
+    """Converte números no formato brasileiro (ex: '195.031.611' ou '1.234,5') para float."""
+    if not value or value.strip() == "-":
+        return 0.0
+    try:
+        return float(value.replace(".", "").replace(",", "."))
+    except ValueError:
+        return 0.0
+
+
+def _filter_item(item: Dict[str, Any], name_field: str, text: str) -> Optional[Dict[str, Any]]:
+    """
+    Retorna o item inteiro se o nome dele contém o texto; senão, uma cópia apenas com os
+    subitens/cultivares que contêm o texto, ou None se nenhum contém. O item original
+    (que pode estar em cache) nunca é alterado.
+    """
+    text = text.lower()
+    if text in str(item.get(name_field, "")).lower():
+        return item
+    filtered = dict(item)
+    found = False
+    for child_list, child_name in CHILD_LISTS.items():
+        if child_list in item:
+            filtered[child_list] = [child for child in item[child_list] if text in str(child.get(child_name, "")).lower()]
+            found = found or bool(filtered[child_list])
+    return filtered if found else None
+
+
+def _filter_items(items: List[Dict[str, Any]], name_field: str, text: str) -> List[Dict[str, Any]]:
+    return [filtered for filtered in (_filter_item(item, name_field, text) for item in items) if filtered is not None]
+
+
+def apply_list_query(
+    data: Dict[str, Any],
+    query: ListQuery,
+    response_model: Type[BaseModel]
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]], Dict[str, str]]:
+    """
+    Aplica filtros, ordenação e paginação à lista `dados` sem alterar o dicionário original
+    (que pode estar em cache). Retorna os dados resultantes, o `include` para a projeção dos
+    campos na serialização e os headers de paginação.
+    """
+    item_model = response_model.model_fields["dados"].annotation.__args__[0]
+    item_fields = list(item_model.model_fields)
+    name_field = next(f for f in NAME_FIELDS if f in item_fields)
+    quantity_field = next(f for f in item_fields if f.startswith("quantidade_"))
+    items: List[Dict[str, Any]] = data["dados"]
+
+    if query.pais is not None:
+        if name_field != "pais":
+            raise HTTPException(status_code=400, detail="O filtro 'pais' só está disponível nas rotas de importação e exportação")
+        items = _filter_items(items, name_field, query.pais)
+    if query.produto is not None:
+        if name_field == "pais":
+            raise HTTPException(status_code=400, detail="O filtro 'produto' não está disponível nas rotas de importação e exportação")
+        items = _filter_items(items, name_field, query.produto)
+
+    if query.ordenar:
+        sort_key = query.ordenar[1:] if query.ordenar.startswith("-") else query.ordenar
+        if sort_key not in ("quantidade", "valor"):
+            raise HTTPException(status_code=400, detail=f"Ordenação inválida: {query.ordenar}. Use quantidade ou valor, com '-' para ordem decrescente")
+        sort_field = quantity_field if sort_key == "quantidade" else "valor_usd"
+        if sort_field not in item_fields:
+            raise HTTPException(status_code=400, detail=f"Ordenação por '{sort_key}' não está disponível nesta rota")
+        items = sorted(items, key=lambda item: _to_number(item.get(sort_field)), reverse=query.ordenar.startswith("-"))
+
+    headers = {}
+    if query.limit is not None or query.cursor is not None:
+        offset = _decode_cursor(query.cursor, query) if query.cursor else 0
+        end = offset + query.limit if query.limit is not None else len(items)
+        headers["X-Total-Count"] = str(len(items))
+        if end < len(items):
+            headers["X-Next-Cursor"] = _encode_cursor(end, query)
+        items = items[offset:end]
+
+    include = None
+    if query.fields:
+        unknown = [f for f in query.fields if f not in item_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Campos inválidos em 'fields': {', '.join(unknown)}. Disponíveis: {', '.join(item_fields)}")
+        fields: Set[str] = set(query.fields)
+        include = {name: True for name in response_model.model_fields if name != "dados"}
+        include["dados"] = {"__all__": fields}
+
+    return {**data, "dados": items}, include, headers
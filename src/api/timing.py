@@ -0,0 +1,111 @@
+import cProfile
+import json
+import logging
+import os
+import random
+import re
+import time
+from typing import Dict, List, Optional
+
+from fastapi import Request
+
+from src.startup import record_request
+from src.timing import request_timings
+
+logger = logging.getLogger(__name__)
+
+# Configuração do profiler amostral (desligado por padrão)
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0.01"))
+PROFILING_DIR = os.getenv("PROFILING_DIR", "profiles")
+
+# O cProfile só permite um profiler ativo por vez no processo
+_profiling_active = False
+
+# Requisições em andamento, e o pico delas enquanto um perfil está sendo coletado. O cProfile
+# perfila toda a thread do event loop, então um perfil inclui o trabalho de requisições concorrentes.
+_in_flight = 0
+_profile_peak_in_flight = 0
+
+def _format_server_timing(timings: Dict[str, List[float]], total_ms: float) -> str:
+    """Monta o valor do header Server-Timing (ex: 'fetch;dur=812.3;desc="2x", total;dur=830.1')."""
+    entries = []
+    for name, durations in timings.items():
+        entry = f"{name};dur={sum(durations):.1f}"
+        if len(durations) > 1:
+            entry += f';desc="{len(durations)}x"'
+        entries.append(entry)
+    entries.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(entries)
+
+
+def _start_profiler() -> Optional[cProfile.Profile]:
+    """Inicia o profiler para uma amostra das requisições, se habilitado."""
+    global _profiling_active, _profile_peak_in_flight
+    if not PROFILING_ENABLED or _profiling_active or random.random() >= PROFILING_SAMPLE_RATE:
+        return None
+    _profiling_active = True
+    _profile_peak_in_flight = _in_flight
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _dump_profile(profiler: cProfile.Profile, request: Request):
+    """
+    Encerra o profiler e grava o perfil em PROFILING_DIR para inspeção offline (pstats/snakeviz).
+    O nome do arquivo inclui o pico de requisições simultâneas durante a coleta (ex: `conc3`):
+    com mais de uma, o perfil também contém o trabalho das outras requisições.
+    """
+    global _profiling_active
+    profiler.disable()
+    _profiling_active = False
+    try:
+        os.makedirs(PROFILING_DIR, exist_ok=True)
+        path_slug = re.sub(r"[^A-Za-z0-9_-]+", "_", request.url.path).strip("_") or "root"
+        filename = f"{time.strftime('%Y%m%dT%H%M%S')}-{time.time_ns() % 10**9:09d}-{request.method}-{path_slug}-conc{_profile_peak_in_flight}.prof"
+        profiler.dump_stats(os.path.join(PROFILING_DIR, filename))
+        logger.info(
+            f"Perfil da requisição {request.method} {request.url.path} gravado em {PROFILING_DIR}/{filename} "
+            f"(pico de {_profile_peak_in_flight} requisições simultâneas durante a coleta)"
+        )
+    except OSError as e:
+        logger.warning(f"Não foi possível gravar o perfil da requisição {request.method} {request.url.path}: {e}")
+
+
+async def server_timing_middleware(request: Request, call_next):
+    """
+    Middleware que registra o tempo de cada etapa da requisição (fetch na Embrapa,
+    backoff entre tentativas, parsing do HTML, validação Pydantic e serialização JSON),
+    expondo-os no header Server-Timing e em uma linha de log estruturada.
+    """
+    global _in_flight, _profile_peak_in_flight
+    timings: Dict[str, List[float]] = {}
+    token = request_timings.set(timings)
+    _in_flight += 1
+    if _profiling_active:
+        _profile_peak_in_flight = max(_profile_peak_in_flight, _in_flight)
+    profiler = _start_profiler()
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        total_ms = (time.perf_counter() - start) * 1000
+        _in_flight -= 1
+        request_timings.reset(token)
+        if profiler:
+            _dump_profile(profiler, request)
+
+    response.headers["Server-Timing"] = _format_server_timing(timings, total_ms)
+    record_request(request.method, request.url.path, response.status_code, start, total_ms)
+    logger.info(json.dumps({
+        "event": "request_timing",
+        "method": request.method,
+        "path": request.url.path,
+        "query": request.url.query,
+        "status_code": response.status_code,
+        "total_ms": round(total_ms, 1),
+        "stages_ms": {name: round(sum(durations), 1) for name, durations in timings.items()},
+        "stage_counts": {name: len(durations) for name, durations in timings.items()},
+    }, ensure_ascii=False))
+    return response
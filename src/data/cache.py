@@ -0,0 +1,101 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+from functools import wraps
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Os dados de um ano raramente mudam; o cache evita refazer o scraping quando a mesma
+# tabela é consultada novamente (ex: com outros filtros ou páginas)
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "3600"))
+
+# Snapshot pré-gerado (ver src/data/snapshot.py) carregado no boot para servir as primeiras requisições do disco
+SNAPSHOT_PATH = os.getenv(
+    "SNAPSHOT_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "snapshot", "embrapa_snapshot.json.gz")
+)
+
+# Chave: (nome da função fetch_and_parse_*, *argumentos); valor: (instante de inserção, dados)
+_parsed_cache: Dict[Tuple, Tuple[float, Dict[str, Any]]] = {}
+
+# Chamadas em andamento por chave: requisições simultâneas à mesma tabela aguardam o mesmo scraping
+_in_flight: Dict[Tuple, asyncio.Task] = {}
+
+
+def cache_key(func_name: str, *args) -> Tuple:
+    """Chave de cache de uma chamada fetch_and_parse_* (também usada nas entradas do snapshot)."""
+    return (func_name, *args)
+
+
+def get_cached(key: Tuple) -> Optional[Dict[str, Any]]:
+    """Retorna os dados em cache para a chave, ou None se ausentes ou expirados."""
+    cached = _parsed_cache.get(key)
+    if cached and time.monotonic() - cached[0] < CACHE_TTL_SECONDS:
+        return cached[1]
+    return None
+
+
+def cached(func):
+    """
+    Guarda em memória o resultado de uma função fetch_and_parse_*, indexado pelos argumentos.
+    Chamadas simultâneas com os mesmos argumentos compartilham uma única execução (single-flight);
+    se ela falhar, todas recebem o erro e a próxima chamada tenta de novo.
+    """
+    async def fill(key: Tuple, args: Tuple) -> Dict[str, Any]:
+        data = await func(*args)
+        _parsed_cache[key] = (time.monotonic(), data)
+        return data
+
+    def forget(key: Tuple, task: asyncio.Task):
+        if _in_flight.get(key) is task:
+            del _in_flight[key]
+
+    @wraps(func)
+    async def wrapper(*args):
+        key = cache_key(func.__name__, *args)
+        data = get_cached(key)
+        if data is not None:
+            return data
+        task = _in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fill(key, args))
+            _in_flight[key] = task
+            task.add_done_callback(lambda done: forget(key, done))
+        # shield: se quem aguarda for cancelado (ex: cliente desconectou), o scraping segue para os demais
+        return await asyncio.shield(task)
+    return wrapper
+
+
+def dump_snapshot(path: str = SNAPSHOT_PATH) -> int:
+    """Grava o conteúdo atual do cache em um snapshot JSON compactado. Retorna a quantidade de entradas."""
+    entries = [{"key": list(key), "data": data} for key, (_, data) in _parsed_cache.items()]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump({"created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "entries": entries}, f, ensure_ascii=False)
+    return len(entries)
+
+
+def load_snapshot(path: str = SNAPSHOT_PATH) -> int:
+    """
+    Carrega um snapshot no cache. As entradas valem por CACHE_TTL_SECONDS a partir do boot,
+    depois disso são atualizadas pelo scraping normalmente. Retorna a quantidade de entradas.
+    """
+    if not os.path.exists(path):
+        logger.info(f"Snapshot de dados não encontrado em {path}; o cache começa vazio. Gere-o com 'python -m src.data.snapshot' antes do deploy.")
+        return 0
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Não foi possível carregar o snapshot de dados {path}: {e}")
+        return 0
+
+    loaded_at = time.monotonic()
+    for entry in snapshot.get("entries", []):
+        _parsed_cache[tuple(entry["key"])] = (loaded_at, entry["data"])
+    logger.info(f"Snapshot de dados carregado de {path} (gerado em {snapshot.get('created_at')}): {len(snapshot.get('entries', []))} entradas.")
+    return len(snapshot.get("entries", []))
@@ -1,10 +1,13 @@
 from bs4 import BeautifulSoup, Tag
 from typing import Dict, Any, List, Callable, Tuple
-import requests
-import time
+import asyncio
+import httpx
 import random
 import logging
 from fastapi import HTTPException
+from src.timing import record_stage
+from src.data.cache import cached
+from src.data.hedging import hedged_fetcher
 
 # Tipagem para a função de processamento de linha
 RowProcessor = Callable[[List[Tag], Dict[str, Any]], None]
@@ -13,6 +16,7 @@ RowProcessor = Callable[[List[Tag], Dict[str, Any]], None]
 BASE_URL = "http://vitibrasil.cnpuv.embrapa.br/index.php"
 logger = logging.getLogger(__name__)
 
+@record_stage("parse")
 def _parse_generic_table(
     html: str,
     table_description: str,
@@ -194,7 +198,7 @@ def _process_total_kg(tfoot: Tag) -> Dict[str, Any]:
 
 # --- Função de Fetch de Dados ---
 
-async def _fetch_embrapa_data(params: dict, ano: int, operation_description: str) -> requests.Response:
+async def _fetch_embrapa_data(params: dict, ano: int, operation_description: str) -> httpx.Response:
     """
     Função auxiliar para buscar dados da Embrapa com lógica de retry.
     operation_description é usado para logging e mensagens de erro.
@@ -208,27 +212,29 @@ async def _fetch_embrapa_data(params: dict, ano: int, operation_description: str
     for attempt in range(max_retries):
         try:
             logger.info(f"Tentativa {attempt + 1} de {max_retries} para {operation_description}, ano {ano}...")
-            # Timeout de conexão: 10s, Timeout de leitura: 30s
-            resp = requests.get(BASE_URL, params=params, timeout=(10, 30))
+            # Timeout de conexão: 10s, Timeout de leitura: 30s (com hedging opcional para cortar a latência de cauda)
+            with record_stage("fetch"):
+                resp = await hedged_fetcher.get(BASE_URL, params=params, timeout=httpx.Timeout(30, connect=10))
             resp.raise_for_status()  # Levanta HTTPError para códigos de status 4xx/5xx
             
             logger.info(f"Sucesso ao buscar dados para {operation_description}, ano {ano} na tentativa {attempt + 1}.")
             return resp # Retorna a resposta em caso de sucesso
-        except requests.exceptions.Timeout as e:
+        except httpx.TimeoutException as e:
             logger.warning(f"Timeout na tentativa {attempt + 1} para {operation_description}, ano {ano}: {e}")
             if attempt == max_retries - 1:
                 raise HTTPException(status_code=504, detail=f"Erro de Timeout ao acessar Embrapa ({operation_description}) após {max_retries} tentativas: {e}")
-        except requests.exceptions.ConnectionError as e:
+        except httpx.NetworkError as e:
             logger.warning(f"Erro de conexão na tentativa {attempt + 1} para {operation_description}, ano {ano}: {e}")
             if attempt == max_retries - 1:
                 raise HTTPException(status_code=503, detail=f"Erro de Conexão ao acessar Embrapa ({operation_description}) após {max_retries} tentativas: {e}")
-        except requests.exceptions.HTTPError as e:
-            status_code_val = resp.status_code if resp else "N/A"
+        except httpx.HTTPStatusError as e:
+            status_code_val = e.response.status_code
             logger.error(f"Erro HTTP {status_code_val} na tentativa {attempt + 1} para {operation_description}, ano {ano}: {e}")
-            # Para erros HTTP específicos, pode ser que não valha a pena tentar novamente (ex: 404 Not Found)
-            if attempt == max_retries - 1 or (resp and resp.status_code >= 400 and resp.status_code < 500 and resp.status_code != 429): # 429 Too Many Requests (Muitas Requisições) pode ser retentado
-                raise HTTPException(status_code=resp.status_code if resp else 500, detail=f"Não foi possível obter dados no site Embrapa ({operation_description}, HTTP {status_code_val}): {e}")
-        except requests.RequestException as e: # Captura outras exceções de requests (ex: InvalidURL)
+            # Erros 4xx (exceto 429 Too Many Requests) não melhoram com nova tentativa (ex: 404 Not Found) e são repassados
+            # na hora; 429 e 5xx são retentados e, esgotadas as tentativas, o status da Embrapa é repassado ao cliente
+            if attempt == max_retries - 1 or (400 <= status_code_val < 500 and status_code_val != 429):
+                raise HTTPException(status_code=status_code_val, detail=f"Não foi possível obter dados no site Embrapa ({operation_description}, HTTP {status_code_val}): {e}")
+        except httpx.HTTPError as e: # Captura outras exceções do httpx (ex: erros de protocolo)
             logger.error(f"Erro genérico de requisição na tentativa {attempt + 1} para {operation_description}, ano {ano}: {e}")
             if attempt == max_retries - 1:
                 raise HTTPException(status_code=502, detail=f"Erro ao acessar Embrapa ({operation_description}) após {max_retries} tentativas: {e}")
@@ -236,7 +242,8 @@ async def _fetch_embrapa_data(params: dict, ano: int, operation_description: str
         # Lógica de backoff exponencial com jitter
         delay = min(base_delay * (2 ** attempt) + random.uniform(1, 3), max_delay)
         logger.info(f"Aguardando {delay:.2f} segundos antes da próxima tentativa para {operation_description}, ano {ano}...")
-        time.sleep(delay)
+        with record_stage("backoff"):
+            await asyncio.sleep(delay)
     
     # Este ponto só deve ser alcançado se algo inesperado ocorrer e o loop terminar sem retornar ou levantar exceção.
     # As exceções dentro do loop devem cobrir o caso de falha na última tentativa.
@@ -337,6 +344,7 @@ def parse_table_processamento_americanas_hibridas(html: str) -> Dict[str, Any]:
 
 # --- Funções de Alto Nível que Combinam Fetch e Parse ---
 
+@cached
 async def fetch_and_parse_producao(ano: int) -> Dict[str, Any]:
     """
     Busca e processa dados de produção para um ano específico.
@@ -365,6 +373,7 @@ async def fetch_and_parse_producao(ano: int) -> Dict[str, Any]:
     }
 
 
+@cached
 async def fetch_and_parse_comercializacao(ano: int) -> Dict[str, Any]:
     """
     Busca e processa dados de comercialização para um ano específico.
@@ -393,6 +402,7 @@ async def fetch_and_parse_comercializacao(ano: int) -> Dict[str, Any]:
     }
 
 
+@cached
 async def fetch_and_parse_processamento(subopcao: str, ano: int, tipo_processamento: str) -> Dict[str, Any]:
     """
     Busca e processa dados de processamento de uvas para um ano específico.
@@ -435,6 +445,7 @@ async def fetch_and_parse_processamento(subopcao: str, ano: int, tipo_processame
     }
 
 
+@cached
 async def fetch_and_parse_comex(opcao_param: str, subopcao: str, ano: int, tipo_operacao: str) -> Dict[str, Any]:
     """
     Busca e processa dados de Comércio Exterior (Importação/Exportação) para um ano específico.
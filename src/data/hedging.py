@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Configuração do hedging (desligado por padrão)
+HEDGING_ENABLED = os.getenv("HEDGING_ENABLED", "false").lower() in ("1", "true", "yes")
+HEDGING_PERCENTILE = float(os.getenv("HEDGING_PERCENTILE", "95"))  # Percentil da latência recente que dispara o hedge
+HEDGING_BUDGET = float(os.getenv("HEDGING_BUDGET", "0.1"))  # Fração máxima de requisições que podem gerar hedge
+HEDGING_MIN_SAMPLES = int(os.getenv("HEDGING_MIN_SAMPLES", "20"))  # Amostras necessárias antes de começar a fazer hedge
+HEDGING_WINDOW = int(os.getenv("HEDGING_WINDOW", "200"))  # Quantidade de latências recentes consideradas
+
+
+class HedgedFetcher:
+    """
+    Faz GETs na Embrapa com hedging opcional: se a primeira requisição não responder
+    dentro do percentil configurado da latência recente, dispara uma segunda requisição
+    idêntica e usa a que responder primeiro. Todas as requisições compartilham um único
+    cliente httpx (pool de conexões e contexto SSL criados uma vez); cada uma roda em uma
+    task asyncio, e cancelar a perdedora descarta a conexão dela em vez de devolvê-la ao pool.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = HEDGING_ENABLED,
+        percentile: float = HEDGING_PERCENTILE,
+        budget: float = HEDGING_BUDGET,
+        min_samples: int = HEDGING_MIN_SAMPLES,
+        window: int = HEDGING_WINDOW
+    ):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self._transport: Optional[httpx.AsyncBaseTransport] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._latencies = deque(maxlen=window)
+        self.stats = {
+            "requests": 0,
+            "hedges_issued": 0,
+            "hedges_won": 0,
+            "hedges_cancelled": 0,
+            "hedges_skipped_budget": 0,
+        }
+
+    @property
+    def transport(self) -> Optional[httpx.AsyncBaseTransport]:
+        """Transport do cliente httpx; permite injetar um transport (ex: httpx.MockTransport)."""
+        return self._transport
+
+    @transport.setter
+    def transport(self, transport: Optional[httpx.AsyncBaseTransport]):
+        self._transport = transport
+        self._client = None  # Recriado no próximo uso com o novo transport
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Retorna o cliente compartilhado, criando-o no primeiro uso. Criar um AsyncClient monta o
+        contexto SSL de forma síncrona (dezenas de ms bloqueando o event loop), por isso ele é
+        reaproveitado entre tentativas, hedges e rotas. As conexões do pool pertencem ao event
+        loop em que foram abertas, então um novo loop (ex: asyncio.run no gerador de snapshot)
+        ganha um cliente próprio.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(transport=self._transport)
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self):
+        """Fecha o cliente compartilhado e suas conexões (chamado no shutdown da aplicação)."""
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+    def _latency_percentile(self, percentile: float) -> Optional[float]:
+        """Retorna o percentil (em segundos) das latências recentes, ou None se não houver amostras suficientes."""
+        if len(self._latencies) < self.min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(int(len(ordered) * percentile / 100), len(ordered) - 1)
+        return ordered[index]
+
+    def _within_budget(self) -> bool:
+        """Verifica se mais um hedge cabe no orçamento (fração das requisições já feitas)."""
+        return self.stats["hedges_issued"] + 1 <= self.budget * self.stats["requests"]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Contadores e latências atuais, para exposição como métricas."""
+        p50 = self._latency_percentile(50)
+        hedge_delay = self._latency_percentile(self.percentile)
+        return {
+            "enabled": self.enabled,
+            **self.stats,
+            "latency_samples": len(self._latencies),
+            "latency_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "hedge_delay_ms": round(hedge_delay * 1000, 1) if hedge_delay is not None else None,
+        }
+
+    async def _timed_get(self, url: str, params: dict, timeout: httpx.Timeout) -> httpx.Response:
+        """
+        Executa o GET e registra a duração da tentativa. Falhas (timeouts, erros de conexão)
+        também entram na janela, com o tempo que levaram, para não enviesar o percentil para
+        baixo; só tentativas canceladas pelo hedging ficam de fora.
+        """
+        client = self._get_client()
+        start = time.perf_counter()
+        cancelled = False
+        try:
+            return await client.get(url, params=params, timeout=timeout)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            if not cancelled:
+                self._latencies.append(time.perf_counter() - start)
+
+    @staticmethod
+    async def _cancel(task: asyncio.Task) -> bool:
+        """
+        Cancela uma requisição e espera o cancelamento fechar a conexão. Retorna False se ela
+        já tinha terminado (com resposta ou erro) antes de o cancelamento ter efeito.
+        """
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+        return task.cancelled()
+
+    async def get(self, url: str, params: dict, timeout: httpx.Timeout) -> httpx.Response:
+        """
+        GET assíncrono com hedging quando habilitado e com amostras suficientes de latência.
+        Exceções do httpx são propagadas normalmente para a lógica de retry.
+        """
+        self.stats["requests"] += 1
+        hedge_delay = self._latency_percentile(self.percentile)
+        if not self.enabled or hedge_delay is None:
+            return await self._timed_get(url, params, timeout)
+
+        primary = asyncio.ensure_future(self._timed_get(url, params, timeout))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+            if done:
+                return primary.result()
+
+            if not self._within_budget():
+                self.stats["hedges_skipped_budget"] += 1
+                return await primary
+
+            logger.info(f"Requisição à Embrapa sem resposta após {hedge_delay * 1000:.0f}ms (p{self.percentile:g}), disparando hedge...")
+            self.stats["hedges_issued"] += 1
+            hedge = asyncio.ensure_future(self._timed_get(url, params, timeout))
+            pending = {primary, hedge}
+
+            winner = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Prefere a requisição original em caso de empate; uma falha só "vence" se a outra também falhar
+                for task in sorted(done, key=lambda t: t is not primary):
+                    if winner is None or winner.exception() is not None:
+                        winner = task
+                if winner.exception() is None:
+                    break
+
+            if winner is hedge and winner.exception() is None:
+                self.stats["hedges_won"] += 1
+            for task in pending:
+                if await self._cancel(task):
+                    self.stats["hedges_cancelled"] += 1
+            pending = set()
+            return winner.result()
+        finally:
+            # Se esta chamada for cancelada, não deixa requisições órfãs para trás
+            for task in pending:
+                await self._cancel(task)
+
+
+# Instância compartilhada usada pelo scraper
+hedged_fetcher = HedgedFetcher()
@@ -0,0 +1,46 @@
+"""
+Gera o snapshot de dados carregado no boot da API (ver src/data/cache.py).
+
+O snapshot não é versionado nem gerado automaticamente: quem faz o deploy deve rodar
+este comando antes de cada deploy (ex: no build command do Render), a partir do
+diretório raiz do projeto:
+
+    python -m src.data.snapshot --anos 2020-2024
+"""
+import argparse
+import asyncio
+import logging
+
+from fastapi import HTTPException
+
+from src.data.cache import SNAPSHOT_PATH, dump_snapshot
+from src.data.sources import SOURCES
+
+logger = logging.getLogger(__name__)
+
+
+async def build_snapshot(first_year: int, last_year: int, output: str) -> int:
+    """Faz o scraping de todas as rotas no intervalo de anos e grava o snapshot. Retorna a quantidade de entradas."""
+    for source in SOURCES:
+        for ano in range(first_year, min(last_year, source.max_year) + 1):
+            try:
+                await source.fetch(ano)
+            except HTTPException as e:
+                logger.error(f"Falha ao gerar snapshot de {source.func_name}{source.args_before}, ano {ano}: {e.detail}")
+    return dump_snapshot(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera o snapshot de dados da Embrapa carregado no boot da API.")
+    parser.add_argument("--anos", default="2023-2024", help="Intervalo de anos, ex: 2020-2024 (padrão: 2023-2024)")
+    parser.add_argument("--output", default=SNAPSHOT_PATH, help=f"Arquivo de saída (padrão: {SNAPSHOT_PATH})")
+    args = parser.parse_args()
+
+    first_year, _, last_year = args.anos.partition("-")
+    entries = asyncio.run(build_snapshot(int(first_year), int(last_year or first_year), args.output))
+    logger.info(f"Snapshot com {entries} entradas gravado em {args.output}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
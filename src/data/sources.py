@@ -0,0 +1,74 @@
+import importlib
+from types import ModuleType
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+from src.data.cache import cache_key, get_cached
+
+
+def scraper() -> ModuleType:
+    """
+    Importa o scraper (e com ele bs4 e httpx) só quando for preciso fazer o scraping,
+    reduzindo o tempo de cold start da aplicação.
+    """
+    return importlib.import_module("src.data.embrapa_scraper")
+
+
+class DataSource(NamedTuple):
+    """
+    Uma tabela da Embrapa: a função fetch_and_parse_* que a busca e os argumentos fixos
+    em torno do ano. Usada pelas rotas e pelo gerador de snapshot, para que ambos usem
+    a mesma chave de cache.
+    """
+    func_name: str
+    args_before: Tuple = ()
+    args_after: Tuple = ()
+    max_year: int = 2023
+
+    def args(self, ano: int) -> Tuple:
+        return (*self.args_before, ano, *self.args_after)
+
+    def key(self, ano: int) -> Tuple:
+        return cache_key(self.func_name, *self.args(ano))
+
+    async def fetch(self, ano: int) -> Dict[str, Any]:
+        """Busca os dados no cache (incluindo o snapshot carregado no boot) ou, se ausentes, no site da Embrapa."""
+        data = get_cached(self.key(ano))
+        if data is None:
+            data = await getattr(scraper(), self.func_name)(*self.args(ano))
+        return data
+
+
+PRODUCAO = DataSource("fetch_and_parse_producao")
+COMERCIALIZACAO = DataSource("fetch_and_parse_comercializacao")
+PROCESSAMENTO_VINIFERAS = DataSource("fetch_and_parse_processamento", ("subopt_01",), ("viníferas",))
+PROCESSAMENTO_AMERICANAS_HIBRIDAS = DataSource("fetch_and_parse_processamento", ("subopt_02",), ("americanas-híbridas",))
+PROCESSAMENTO_UVAS_MESA = DataSource("fetch_and_parse_processamento", ("subopt_03",), ("uvas-mesa",))
+PROCESSAMENTO_SEM_CLASSIFICACAO = DataSource("fetch_and_parse_processamento", ("subopt_04",), ("sem-classificação",))
+IMPORTACAO_VINHO_MESA = DataSource("fetch_and_parse_comex", ("opt_05", "subopt_01"), ("importação",), 2024)
+IMPORTACAO_ESPUMANTE = DataSource("fetch_and_parse_comex", ("opt_05", "subopt_02"), ("importação",), 2024)
+IMPORTACAO_UVAS_FRESCAS = DataSource("fetch_and_parse_comex", ("opt_05", "subopt_03"), ("importação",), 2024)
+IMPORTACAO_UVAS_PASSAS = DataSource("fetch_and_parse_comex", ("opt_05", "subopt_04"), ("importação",), 2024)
+IMPORTACAO_SUCO_UVA = DataSource("fetch_and_parse_comex", ("opt_05", "subopt_05"), ("importação",), 2024)
+EXPORTACAO_VINHO_MESA = DataSource("fetch_and_parse_comex", ("opt_06", "subopt_01"), ("exportação",), 2024)
+EXPORTACAO_ESPUMANTE = DataSource("fetch_and_parse_comex", ("opt_06", "subopt_02"), ("exportação",), 2024)
+EXPORTACAO_UVAS_FRESCAS = DataSource("fetch_and_parse_comex", ("opt_06", "subopt_03"), ("exportação",), 2024)
+# Exportação usa subopt_04 para suco de uva
+EXPORTACAO_SUCO_UVA = DataSource("fetch_and_parse_comex", ("opt_06", "subopt_04"), ("exportação",), 2024)
+
+SOURCES: List[DataSource] = [
+    PRODUCAO,
+    COMERCIALIZACAO,
+    PROCESSAMENTO_VINIFERAS,
+    PROCESSAMENTO_AMERICANAS_HIBRIDAS,
+    PROCESSAMENTO_UVAS_MESA,
+    PROCESSAMENTO_SEM_CLASSIFICACAO,
+    IMPORTACAO_VINHO_MESA,
+    IMPORTACAO_ESPUMANTE,
+    IMPORTACAO_UVAS_FRESCAS,
+    IMPORTACAO_UVAS_PASSAS,
+    IMPORTACAO_SUCO_UVA,
+    EXPORTACAO_VINHO_MESA,
+    EXPORTACAO_ESPUMANTE,
+    EXPORTACAO_UVAS_FRESCAS,
+    EXPORTACAO_SUCO_UVA,
+]
@@ -1,22 +1,43 @@
+import time
+
+# Início do cold start, usado no relatório de inicialização
+_startup_started_at = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import RedirectResponse
 import logging
 import os
+import sys
+from contextlib import asynccontextmanager
 from src.api.endpoints import router
+from src.api.timing import server_timing_middleware
+from src.startup import mark_startup, startup_report
+from src.data.cache import load_snapshot
 
 # Configura o logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Fecha o cliente httpx compartilhado, se o scraper chegou a ser carregado
+    hedging = sys.modules.get("src.data.hedging")
+    if hedging:
+        await hedging.hedged_fetcher.aclose()
+
+
 app = FastAPI(
     title="API Produção Vinhos EMBRAPA",
     description="API para consulta de dados de produção, comercialização, processamento e comércio exterior de vinhos e derivados do Rio Grande do Sul, baseada nos dados da EMBRAPA.",
     version="1.0.0",
     docs_url="/docs",  # URL para Swagger UI
     redoc_url="/redoc",  # URL para ReDoc
-    openapi_url="/openapi.json"  # URL para o schema OpenAPI
+    openapi_url="/openapi.json",  # URL para o schema OpenAPI
+    lifespan=lifespan
 )
 
 # Configuração do CORS
@@ -26,8 +47,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Permite todos os métodos HTTP
     allow_headers=["*"],  # Permite todos os headers
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "Server-Timing"],  # Headers de paginação e tempos legíveis pelo frontend
 )
 
+# Tempos por etapa (fetch, backoff, parse, validate, render) no header Server-Timing
+app.middleware("http")(server_timing_middleware)
+
 # Caminho para os arquivos do frontend
 frontend_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend")
 
@@ -50,5 +75,23 @@ async def swagger():
     return RedirectResponse(url="/docs")
 
 
+# Métricas internas (cold start e hedging das requisições à Embrapa)
+@app.get("/metrics", summary="Métricas internas da API")
+async def metrics():
+    # Import tardio: o módulo de hedging carrega o httpx, que não é necessário no boot
+    from src.data.hedging import hedged_fetcher
+    return {"startup": startup_report, "hedging": hedged_fetcher.snapshot()}
+
+
 # Inclui o router com todos os endpoints da API
 app.include_router(router)
+
+# Carrega o snapshot de dados pré-gerado para servir as primeiras requisições do disco
+_snapshot_started_at = time.perf_counter()
+_snapshot_entries = load_snapshot()
+mark_startup(
+    _startup_started_at,
+    data_paths=[route.path for route in router.routes],
+    snapshot_entries=_snapshot_entries,
+    snapshot_load_ms=round((time.perf_counter() - _snapshot_started_at) * 1000, 1)
+)
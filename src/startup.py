@@ -0,0 +1,69 @@
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Orçamento de cold start: inicialização + duração da primeira requisição de dados (verificado por tests/test_cold_start.py)
+TTFR_BUDGET_MS = float(os.getenv("TTFR_BUDGET_MS", "3000"))
+
+# Relatório de cold start do worker, preenchido por src/main.py e pelo middleware de timing e exposto
+# em GET /metrics. Cada worker (ex: gunicorn com vários workers) tem o seu, identificado pelo pid.
+# Os tempos são contados a partir da primeira linha de src/main.py: a inicialização do interpretador
+# e do servidor fica de fora e é medida externamente por tests/test_cold_start.py.
+startup_report: Dict[str, Any] = {
+    "pid": os.getpid(),
+    "startup_ms": None,
+    "snapshot_entries": 0,
+    "snapshot_load_ms": None,
+    "first_request_ms": None,
+    "first_request_idle_ms": None,
+    "time_to_first_response_ms": None,
+    "time_to_first_response_budget_ms": TTFR_BUDGET_MS,
+    "time_to_first_response_within_budget": None,
+    "first_response_path": None,
+}
+_startup_finished_at: Optional[float] = None
+_first_response_paths: Set[str] = set()
+
+
+def mark_startup(started_at: float, data_paths: Iterable[str], **details):
+    """
+    Registra o fim da inicialização. `started_at` é o perf_counter() da primeira linha de
+    src/main.py; `data_paths` são as rotas de dados cuja primeira resposta bem-sucedida
+    entra no tempo até a primeira resposta (preflights, /metrics, docs e estáticos não contam).
+    """
+    global _startup_finished_at, _first_response_paths
+    _startup_finished_at = time.perf_counter()
+    _first_response_paths = set(data_paths)
+    startup_report.update(details)
+    startup_report["startup_ms"] = round((_startup_finished_at - started_at) * 1000, 1)
+    logger.info(json.dumps({"event": "startup", **startup_report}, ensure_ascii=False))
+
+
+def record_request(method: str, path: str, status_code: int, started_at: float, duration_ms: float):
+    """
+    Chamado pelo middleware ao fim de cada requisição. Na primeira resposta bem-sucedida (GET)
+    de uma rota de dados, registra o tempo até a primeira resposta como inicialização + duração
+    dessa requisição e o compara com TTFR_BUDGET_MS. O tempo ocioso entre o fim da inicialização
+    e a chegada da requisição fica em `first_request_idle_ms` e não conta para o orçamento.
+    """
+    if (
+        startup_report["time_to_first_response_ms"] is not None
+        or _startup_finished_at is None
+        or method != "GET"
+        or path not in _first_response_paths
+        or status_code >= 400
+    ):
+        return
+
+    ttfr_ms = round(startup_report["startup_ms"] + duration_ms, 1)
+    startup_report["first_request_ms"] = round(duration_ms, 1)
+    startup_report["first_request_idle_ms"] = round(max(started_at - _startup_finished_at, 0) * 1000, 1)
+    startup_report["time_to_first_response_ms"] = ttfr_ms
+    startup_report["time_to_first_response_within_budget"] = ttfr_ms <= TTFR_BUDGET_MS
+    startup_report["first_response_path"] = path
+    log = logger.info if ttfr_ms <= TTFR_BUDGET_MS else logger.warning
+    log(json.dumps({"event": "first_response", **startup_report}, ensure_ascii=False))
@@ -0,0 +1,24 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+# Tempos (em ms) de cada etapa da requisição atual, agrupados pelo nome da etapa.
+# Definido pelo middleware em src/api/timing.py; fica aqui para que a camada de dados
+# possa registrar etapas sem depender da camada de API.
+request_timings: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("server_timings", default=None)
+
+
+@contextmanager
+def record_stage(name: str):
+    """
+    Mede o tempo de um bloco e o acumula na etapa `name` da requisição atual.
+    Fora de uma requisição (ex: scripts ou testes) não registra nada.
+    """
+    timings = request_timings.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings.setdefault(name, []).append((time.perf_counter() - start) * 1000)
@@ -0,0 +1,84 @@
+"""
+Benchmark de cold start: sobe a aplicação em um subprocesso, servindo a partir de um
+snapshot, e verifica o tempo até a primeira resposta de dados contra TTFR_BUDGET_MS.
+
+São verificados dois números:
+- o medido de fora, do início do processo até a primeira resposta (inclui interpretador e uvicorn);
+- o `time_to_first_response_ms` reportado em /metrics: inicialização (a partir do import de
+  src/main.py) + duração da primeira requisição de dados, sem o tempo ocioso entre as duas.
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+
+from src.startup import TTFR_BUDGET_MS
+from src.data import cache
+from src.data.sources import IMPORTACAO_VINHO_MESA
+
+pytest.importorskip("uvicorn")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ANO = 2024
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_time_to_first_response_within_budget(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "_parsed_cache", {})
+    data = {
+        "ano": ANO,
+        "tipo_produto": "vinho-mesa",
+        "dados": [{"pais": "Chile", "quantidade_kg": "10", "valor_usd": "20"}],
+        "total_geral_kg": "10",
+        "total_geral_valor_us": "20",
+    }
+    cache._parsed_cache[IMPORTACAO_VINHO_MESA.key(ANO)] = (time.monotonic(), data)
+    snapshot_path = str(tmp_path / "snapshot.json.gz")
+    cache.dump_snapshot(snapshot_path)
+
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = {**os.environ, "SNAPSHOT_PATH": snapshot_path, "TTFR_BUDGET_MS": str(TTFR_BUDGET_MS), "HEDGING_ENABLED": "false"}
+    started_at = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=PROJECT_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        resp = None
+        deadline = started_at + max(TTFR_BUDGET_MS / 1000, 1) * 5
+        while time.perf_counter() < deadline:
+            try:
+                resp = httpx.get(f"{base_url}/importacao/vinho-mesa", params={"ano": ANO}, timeout=1)
+                break
+            except httpx.TransportError:
+                time.sleep(0.02)
+        wall_clock_ms = (time.perf_counter() - started_at) * 1000
+
+        assert resp is not None and resp.status_code == 200
+        assert resp.json() == data
+        assert "fetch" not in resp.headers["Server-Timing"]  # Servido do snapshot, sem scraping
+
+        startup = httpx.get(f"{base_url}/metrics", timeout=1).json()["startup"]
+        assert startup["snapshot_entries"] == 1
+        assert startup["first_response_path"] == "/importacao/vinho-mesa"
+        assert startup["time_to_first_response_within_budget"] is True
+        assert startup["time_to_first_response_ms"] == pytest.approx(startup["startup_ms"] + startup["first_request_ms"], abs=0.2)
+        assert startup["time_to_first_response_ms"] <= TTFR_BUDGET_MS
+        assert startup["first_request_idle_ms"] >= 0
+        assert wall_clock_ms <= TTFR_BUDGET_MS, f"Primeira resposta em {wall_clock_ms:.0f}ms (orçamento: {TTFR_BUDGET_MS:.0f}ms)"
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
@@ -0,0 +1,138 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from src.data.hedging import HedgedFetcher
+
+URL = "http://embrapa.test/index.php"
+TIMEOUT = httpx.Timeout(30, connect=10)
+
+
+def _fetcher(handler, budget: float = 1.0, enabled: bool = True) -> HedgedFetcher:
+    """Fetcher com janela de latência já aquecida (hedge após ~10ms) e transport simulado."""
+    fetcher = HedgedFetcher(enabled=enabled, percentile=95, budget=budget, min_samples=5, window=50)
+    fetcher._latencies.extend([0.01] * 5)
+    fetcher.transport = httpx.MockTransport(handler)
+    return fetcher
+
+
+def _handler(*behaviours):
+    """Cria um handler assíncrono cuja n-ésima chamada segue behaviours[n]: (atraso em s, status ou exceção)."""
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        delay, outcome = behaviours[min(len(calls), len(behaviours) - 1)]
+        calls.append(request)
+        await asyncio.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome, text=f"resposta {len(calls)}")
+
+    handler.calls = calls
+    return handler
+
+
+def test_hedge_wins_and_slow_primary_is_cancelled():
+    handler = _handler((5, 200), (0, 200))
+    fetcher = _fetcher(handler)
+
+    start = time.perf_counter()
+    resp = asyncio.run(fetcher.get(URL, {}, TIMEOUT))
+
+    assert resp.status_code == 200
+    assert time.perf_counter() - start < 1
+    assert len(handler.calls) == 2
+    assert fetcher.stats["hedges_issued"] == 1
+    assert fetcher.stats["hedges_won"] == 1
+    assert fetcher.stats["hedges_cancelled"] == 1
+
+
+def test_primary_failure_falls_back_to_hedge():
+    handler = _handler((0.05, httpx.ConnectError("falha")), (0.2, 200))
+    fetcher = _fetcher(handler)
+
+    resp = asyncio.run(fetcher.get(URL, {}, TIMEOUT))
+
+    assert resp.status_code == 200
+    assert fetcher.stats["hedges_won"] == 1
+    assert fetcher.stats["hedges_cancelled"] == 0
+
+
+def test_both_failures_propagate_the_error():
+    handler = _handler((0.05, httpx.ConnectError("falha")))
+    fetcher = _fetcher(handler)
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(fetcher.get(URL, {}, TIMEOUT))
+    assert fetcher.stats["hedges_won"] == 0
+
+
+def test_budget_exhausted_skips_hedge():
+    handler = _handler((0.1, 200))
+    fetcher = _fetcher(handler, budget=0)
+
+    resp = asyncio.run(fetcher.get(URL, {}, TIMEOUT))
+
+    assert resp.status_code == 200
+    assert len(handler.calls) == 1
+    assert fetcher.stats["hedges_issued"] == 0
+    assert fetcher.stats["hedges_skipped_budget"] == 1
+
+
+def test_concurrent_hung_requests_are_not_queued_behind_each_other():
+    # Cada requisição original trava; os hedges respondem na hora
+    hung = set()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        key = request.url.params["id"]
+        if key not in hung:
+            hung.add(key)
+            await asyncio.sleep(3)
+        return httpx.Response(200)
+
+    fetcher = _fetcher(handler)
+
+    async def run():
+        return await asyncio.gather(*(fetcher.get(URL, {"id": str(i)}, TIMEOUT) for i in range(10)))
+
+    start = time.perf_counter()
+    responses = asyncio.run(run())
+
+    assert all(resp.status_code == 200 for resp in responses)
+    assert time.perf_counter() - start < 1
+    assert fetcher.stats["hedges_won"] == 10
+    assert fetcher.stats["hedges_cancelled"] == 10
+
+
+def test_disabled_hedging_records_failed_attempts():
+    handler = _handler((0, httpx.ReadTimeout("timeout")))
+    fetcher = _fetcher(handler, enabled=False)
+    samples_before = len(fetcher._latencies)
+
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(fetcher.get(URL, {}, TIMEOUT))
+
+    assert len(handler.calls) == 1
+    assert len(fetcher._latencies) == samples_before + 1
+    assert fetcher.stats["hedges_issued"] == 0
+
+
+def test_client_is_shared_across_requests_and_closed():
+    handler = _handler((5, 200), (0, 200))
+    fetcher = _fetcher(handler)
+
+    async def run():
+        await fetcher.get(URL, {}, TIMEOUT)
+        client = fetcher._client
+        await fetcher.get(URL, {}, TIMEOUT)
+        assert fetcher._client is client
+        await fetcher.aclose()
+        return client
+
+    client = asyncio.run(run())
+
+    assert len(handler.calls) == 3  # Original e hedge do primeiro GET, mais o segundo GET
+    assert client.is_closed
+    assert fetcher._client is None
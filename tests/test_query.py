@@ -0,0 +1,166 @@
+import copy
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from src.api.models import ImportacaoExportacaoResponse, ProcessamentoResponse, ProducaoResponse
+from src.api.query import ListQuery, _encode_cursor, apply_list_query
+from src.data.hedging import hedged_fetcher
+from src.main import app
+
+COMEX = {
+    "ano": 2023,
+    "tipo_produto": "vinho-mesa",
+    "dados": [
+        {"pais": "Argentina", "quantidade_kg": "1.000", "valor_usd": "5.000"},
+        {"pais": "Chile", "quantidade_kg": "3.000", "valor_usd": "2.000"},
+        {"pais": "Itália", "quantidade_kg": "2.000", "valor_usd": "9.000"},
+        {"pais": "Portugal", "quantidade_kg": "-", "valor_usd": "7.000"},
+    ],
+    "total_geral_kg": "6.000",
+    "total_geral_valor_us": "23.000",
+}
+
+PRODUCAO = {
+    "ano": 2022,
+    "dados": [
+        {
+            "produto": "VINHO DE MESA",
+            "quantidade_litros": "195.031.611",
+            "subitems": [
+                {"produto": "Tinto", "quantidade_litros": "162.844.214"},
+                {"produto": "Branco", "quantidade_litros": "30.198.430"},
+                {"produto": "Rosado", "quantidade_litros": "1.988.968"},
+            ],
+        },
+        {"produto": "SUCO", "quantidade_litros": "1.000", "subitems": [{"produto": "Suco integral", "quantidade_litros": "1.000"}]},
+    ],
+    "total_geral_litros": "308.352.487",
+}
+
+
+def _query(**params) -> ListQuery:
+    defaults = {"fields": None, "pais": None, "produto": None, "ordenar": None, "limit": None, "cursor": None}
+    return ListQuery(**{**defaults, **params})
+
+
+def _render(data, model, **params):
+    result, include, headers = apply_list_query(data, _query(**params), model)
+    return model.model_validate(result).model_dump(include=include), headers
+
+
+def _status(data, model, **params) -> int:
+    with pytest.raises(HTTPException) as exc:
+        apply_list_query(data, _query(**params), model)
+    return exc.value.status_code
+
+
+def test_sort_by_value_descending_with_limit_and_projection():
+    body, headers = _render(COMEX, ImportacaoExportacaoResponse, ordenar="-valor", limit=2, fields="pais,valor_usd")
+
+    assert body["dados"] == [{"pais": "Itália", "valor_usd": "9.000"}, {"pais": "Portugal", "valor_usd": "7.000"}]
+    assert body["total_geral_valor_us"] == "23.000"
+    assert headers["X-Total-Count"] == "4"
+
+
+def test_cursor_walks_pages_in_order():
+    body, headers = _render(COMEX, ImportacaoExportacaoResponse, ordenar="quantidade", limit=3)
+    assert [item["pais"] for item in body["dados"]] == ["Portugal", "Argentina", "Itália"]
+
+    body, headers = _render(COMEX, ImportacaoExportacaoResponse, ordenar="quantidade", limit=3, cursor=headers["X-Next-Cursor"])
+    assert [item["pais"] for item in body["dados"]] == ["Chile"]
+    assert "X-Next-Cursor" not in headers
+
+
+def test_cursor_rejected_when_sort_or_filters_change():
+    _, headers = _render(COMEX, ImportacaoExportacaoResponse, ordenar="-valor", limit=1)
+
+    assert _status(COMEX, ImportacaoExportacaoResponse, ordenar="valor", limit=1, cursor=headers["X-Next-Cursor"]) == 400
+    assert _status(COMEX, ImportacaoExportacaoResponse, ordenar="-valor", pais="a", limit=1, cursor=headers["X-Next-Cursor"]) == 400
+
+
+@pytest.mark.parametrize("cursor", ["zzz", "!!", _encode_cursor(-1, _query())])
+def test_invalid_or_negative_cursor_returns_400(cursor):
+    assert _status(COMEX, ImportacaoExportacaoResponse, cursor=cursor) == 400
+
+
+def test_unknown_field_returns_400():
+    assert _status(COMEX, ImportacaoExportacaoResponse, fields="pais,foo") == 400
+
+
+def test_invalid_or_unavailable_sort_returns_400():
+    assert _status(COMEX, ImportacaoExportacaoResponse, ordenar="preco") == 400
+    assert _status(PRODUCAO, ProducaoResponse, ordenar="-valor") == 400
+
+
+def test_filters_only_available_on_matching_routes():
+    assert _status(COMEX, ImportacaoExportacaoResponse, produto="vinho") == 400
+    assert _status(PRODUCAO, ProducaoResponse, pais="Chile") == 400
+
+
+def test_pais_filter_is_case_insensitive():
+    body, _ = _render(COMEX, ImportacaoExportacaoResponse, pais="ITÁ")
+    assert [item["pais"] for item in body["dados"]] == ["Itália"]
+
+
+def test_produto_filter_keeps_only_matching_children_without_touching_source():
+    original = copy.deepcopy(PRODUCAO)
+
+    body, _ = _render(PRODUCAO, ProducaoResponse, produto="tinto")
+
+    assert len(body["dados"]) == 1
+    assert body["dados"][0]["produto"] == "VINHO DE MESA"
+    assert [sub["produto"] for sub in body["dados"][0]["subitems"]] == ["Tinto"]
+    assert PRODUCAO == original
+
+
+def test_produto_filter_matching_parent_keeps_all_children():
+    body, _ = _render(PRODUCAO, ProducaoResponse, produto="vinho")
+    assert len(body["dados"][0]["subitems"]) == 3
+
+
+def test_produto_filter_on_cultivares():
+    data = {
+        "ano": 2020,
+        "tipo_processamento": "viníferas",
+        "dados": [
+            {"categoria": "TINTAS", "quantidade_kg": "10", "cultivares": [{"cultivar": "Merlot", "quantidade_kg": "4"}, {"cultivar": "Tannat", "quantidade_kg": "6"}]},
+            {"categoria": "BRANCAS", "quantidade_kg": "5", "cultivares": [{"cultivar": "Riesling", "quantidade_kg": "5"}]},
+        ],
+        "total_geral_kg": "15",
+    }
+    body, _ = _render(data, ProcessamentoResponse, produto="merlot")
+    assert body["dados"] == [{"categoria": "TINTAS", "quantidade_kg": "10", "cultivares": [{"cultivar": "Merlot", "quantidade_kg": "4"}]}]
+
+
+COMEX_HTML = """
+<table class="tb_base tb_dados">
+  <thead><tr><th>Países</th><th>Quantidade (Kg)</th><th>Valor (US$)</th></tr></thead>
+  <tbody>
+    <tr><td>Argentina</td><td>1.000</td><td>5.000</td></tr>
+    <tr><td>Chile</td><td>3.000</td><td>2.000</td></tr>
+    <tr><td>Itália</td><td>2.000</td><td>9.000</td></tr>
+  </tbody>
+  <tfoot class="tb_total"><tr><td>Total</td><td>6.000</td><td>16.000</td></tr></tfoot>
+</table>
+"""
+
+
+def test_route_pagination_headers_are_exposed_to_cross_origin_clients(monkeypatch):
+    monkeypatch.setattr(hedged_fetcher, "transport", httpx.MockTransport(lambda request: httpx.Response(200, text=COMEX_HTML)))
+    client = TestClient(app)
+
+    resp = client.get(
+        "/exportacao/espumante",
+        params={"ano": 1999, "ordenar": "-valor", "limit": 2, "fields": "pais"},
+        headers={"Origin": "http://example.com"},
+    )
+
+    assert resp.status_code == 200
+    assert resp.json()["dados"] == [{"pais": "Itália"}, {"pais": "Argentina"}]
+    assert resp.headers["X-Total-Count"] == "3"
+    assert "X-Next-Cursor" in resp.headers
+    exposed = resp.headers["Access-Control-Expose-Headers"]
+    assert all(header in exposed for header in ("X-Total-Count", "X-Next-Cursor", "Server-Timing"))
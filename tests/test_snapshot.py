@@ -0,0 +1,150 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from src.api.endpoints import router
+from src.data import cache
+from src.data.hedging import hedged_fetcher
+from src.data.sources import SOURCES, scraper
+from src.main import app
+
+ANO = 2020
+
+
+def _table(headers, rows, total):
+    head = "".join(f"<th>{h}</th>" for h in headers)
+    body = "".join("<tr>" + "".join(f'<td class="{cls}">{v}</td>' for cls, v in row) + "</tr>" for row in rows)
+    foot = "".join(f"<td>{v}</td>" for v in total)
+    return (
+        f'<table class="tb_base tb_dados"><thead><tr>{head}</tr></thead><tbody>{body}</tbody>'
+        f'<tfoot class="tb_total"><tr>{foot}</tr></tfoot></table>'
+    )
+
+
+def _embrapa_page(request: httpx.Request) -> httpx.Response:
+    """Simula as páginas da Embrapa conforme opcao/subopcao."""
+    opcao = request.url.params["opcao"]
+    subopcao = request.url.params.get("subopcao")
+    if opcao in ("opt_05", "opt_06"):
+        html = _table(["Países", "Quantidade (Kg)", "Valor (US$)"], [[("", "Chile"), ("", "10"), ("", "20")]], ["Total", "10", "20"])
+    elif opcao == "opt_03" and subopcao == "subopt_04":
+        html = _table(["Sem definição", "Quantidade (Kg)"], [[("tb_item", "Sem definição"), ("", "5")]], ["Total", "5"])
+    elif opcao == "opt_03":
+        html = _table(
+            ["Cultivar", "Quantidade (Kg)"],
+            [[("tb_item", "TINTAS"), ("", "5")], [("tb_subitem", "Merlot"), ("", "5")]],
+            ["Total", "5"],
+        )
+    else:
+        html = _table(
+            ["Produto", "Quantidade (L)"],
+            [[("tb_item", "VINHO DE MESA"), ("", "5")], [("tb_subitem", "Tinto"), ("", "5")]],
+            ["Total", "5"],
+        )
+    return httpx.Response(200, text=html)
+
+
+def _offline(request: httpx.Request) -> httpx.Response:
+    raise AssertionError(f"Requisição inesperada à Embrapa: {request.url}")
+
+
+@pytest.fixture
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(cache, "_parsed_cache", {})
+
+
+def test_snapshot_round_trip(empty_cache, tmp_path):
+    key = cache.cache_key("fetch_and_parse_comex", "opt_05", "subopt_01", ANO, "importação")
+    cache._parsed_cache[key] = (0, {"ano": ANO, "dados": [{"pais": "Chile"}]})
+    path = str(tmp_path / "snapshot.json.gz")
+
+    assert cache.dump_snapshot(path) == 1
+    cache._parsed_cache.clear()
+    assert cache.load_snapshot(path) == 1
+
+    assert cache.get_cached(key) == {"ano": ANO, "dados": [{"pais": "Chile"}]}
+
+
+def test_missing_snapshot_is_ignored(empty_cache, tmp_path):
+    assert cache.load_snapshot(str(tmp_path / "inexistente.json.gz")) == 0
+
+
+def test_every_source_maps_to_a_cached_scraper_function(empty_cache, monkeypatch):
+    monkeypatch.setattr(hedged_fetcher, "transport", httpx.MockTransport(_embrapa_page))
+
+    for source in SOURCES:
+        assert hasattr(scraper(), source.func_name)
+        asyncio.run(getattr(scraper(), source.func_name)(*source.args(ANO)))
+        # A chave gravada pelo decorator @cached é a mesma que a rota e o snapshot consultam
+        assert cache.get_cached(source.key(ANO)) is not None
+
+
+def test_every_route_is_served_from_the_snapshot(empty_cache, monkeypatch, tmp_path):
+    monkeypatch.setattr(hedged_fetcher, "transport", httpx.MockTransport(_embrapa_page))
+    for source in SOURCES:
+        asyncio.run(source.fetch(ANO))
+    path = str(tmp_path / "snapshot.json.gz")
+    assert cache.dump_snapshot(path) == len(SOURCES)
+
+    cache._parsed_cache.clear()
+    cache.load_snapshot(path)
+    monkeypatch.setattr(hedged_fetcher, "transport", httpx.MockTransport(_offline))
+    client = TestClient(app)
+
+    assert len(router.routes) == len(SOURCES)
+    for route in router.routes:
+        resp = client.get(route.path, params={"ano": ANO})
+        assert resp.status_code == 200, route.path
+        assert "fetch" not in resp.headers["Server-Timing"]
+
+
+def test_upstream_client_error_is_passed_through_without_retry(empty_cache, monkeypatch):
+    calls = []
+
+    def not_found(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(404)
+
+    monkeypatch.setattr(hedged_fetcher, "transport", httpx.MockTransport(not_found))
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(SOURCES[0].fetch(ANO))
+
+    assert exc_info.value.status_code == 404
+    assert len(calls) == 1
+
+
+def test_concurrent_calls_share_one_scrape(empty_cache, monkeypatch):
+    calls = []
+
+    async def slow_page(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(0.05)
+        return _embrapa_page(request)
+
+    monkeypatch.setattr(hedged_fetcher, "transport", httpx.MockTransport(slow_page))
+
+    async def run():
+        return await asyncio.gather(*(SOURCES[0].fetch(ANO) for _ in range(5)))
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(result == results[0] for result in results)
+    assert cache._in_flight == {}
+
+
+def test_failed_scrape_is_not_shared_with_later_calls(empty_cache, monkeypatch):
+    monkeypatch.setattr(hedged_fetcher, "transport", httpx.MockTransport(lambda request: httpx.Response(404)))
+
+    async def run():
+        return await asyncio.gather(*(SOURCES[0].fetch(ANO) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, HTTPException) for result in asyncio.run(run()))
+    assert cache._in_flight == {}
+
+    monkeypatch.setattr(hedged_fetcher, "transport", httpx.MockTransport(_embrapa_page))
+    assert asyncio.run(SOURCES[0].fetch(ANO))["ano"] == ANO